@@ -0,0 +1,68 @@
+"""Local load test of AntSystemService.
+
+Sends concurrent solve requests for a few sub-instances of dj38 and
+reports latency percentiles and throughput.
+
+    python load_test.py --requests 100 --concurrency 16
+"""
+import argparse
+import asyncio
+import time
+import numpy as np
+from src.solver_service import AntSystemService
+
+
+def distance_matrix(cities: np.ndarray) -> np.ndarray:
+    return np.linalg.norm(cities[:, np.newaxis] - cities[np.newaxis], axis=-1)
+
+
+async def run_load_test(args: argparse.Namespace) -> None:
+    cities = np.loadtxt("data/dj38.tsp", skiprows=1)
+    instances = [
+        distance_matrix(cities[: len(cities) - i]) for i in range(args.instances)
+    ]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    failures = 0
+
+    async def request(service: AntSystemService, i: int) -> None:
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await service.solve(
+                    instances[i % len(instances)],
+                    alpha=1,
+                    beta=2,
+                    evaporation_rate=0.1,
+                    n_ants=args.ants,
+                    round_trip=True,
+                    max_cycles=args.cycles,
+                    seed=i + 1,
+                    deadline=args.deadline,
+                )
+            except TimeoutError:
+                failures += 1
+            latencies.append(time.perf_counter() - start)
+
+    async with AntSystemService(max_workers=args.workers) as service:
+        start = time.perf_counter()
+        await asyncio.gather(*(request(service, i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - start
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    print(f"Requests:   {args.requests} ({failures} timed out)")
+    print(f"Latency:    p50={p50:.3f}s p90={p90:.3f}s p99={p99:.3f}s")
+    print(f"Throughput: {args.requests / elapsed:.2f} requests/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--instances", type=int, default=3)
+    parser.add_argument("--ants", type=int, default=10)
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument("--deadline", type=float, default=None)
+    asyncio.run(run_load_test(parser.parse_args()))
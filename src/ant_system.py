@@ -1,7 +1,22 @@
 import numpy as np
+from typing import Callable
 from src.random_variable import DiscreteRandomVariable
 
 
+def heuristic_matrix(cities_distance: np.ndarray, beta: float) -> np.ndarray:
+    """Return the matrix (1 / Mij)^beta used to weight each edge.
+
+    Parameters
+    ----------
+    cities_distance : np.ndarray
+        A square matrix M of shape (n_cities, n_cities).
+    beta : float
+        Factor of heuristic importance, beta >= 0
+    """
+    with np.errstate(divide="ignore"):
+        return np.power(np.asarray(cities_distance, dtype=float), -beta)
+
+
 class AntSystem:
     def __init__(
         self,
@@ -12,6 +27,7 @@ class AntSystem:
         n_ants: int,
         round_trip: bool,
         random_variable: DiscreteRandomVariable,
+        heuristic: np.ndarray = None,
     ):
         """Ant System algorithm.
 
@@ -31,33 +47,67 @@ class AntSystem:
             Number of ants
         round_trip : bool
             If True, the ants will return to the starting city.
+        random_variable : DiscreteRandomVariable
+            Its generator provides the random numbers used to place \
+            the ants and to choose the next cities.
+        heuristic : np.ndarray
+            Precomputed ``heuristic_matrix(cities_distance, beta)``, \
+            e.g. cached from a previous instance. If None, it is \
+            computed. It is recomputed whenever ``beta`` is changed.
         """
-        self.cities_distance = cities_distance
+        self.cities_distance = np.asarray(cities_distance, dtype=float)
         self.alpha = alpha
-        self.beta = beta
+        self._beta = beta
         self.n_ants = n_ants
         self.evaporation_rate = evaporation_rate
         self.round_trip = round_trip
         self.random_variable = random_variable
+        if heuristic is None:
+            heuristic = heuristic_matrix(self.cities_distance, beta)
+        elif heuristic.shape != self.cities_distance.shape:
+            raise ValueError("'heuristic' must have shape (n_cities, n_cities)")
+        self.heuristic = heuristic
         self.cities = np.arange(cities_distance.shape[0])  # [0, 1, 2, ..., n_cities]
         self.pheromone = np.ones(cities_distance.shape)
         self.best_solution: np.ndarray = None
         self.best_solution_cost: float = np.inf
         self._cycle_best_solution: np.ndarray = None
         self._cycle_best_solution_cost: np.ndarray = None
+        self._allocate_buffers()
 
-    def initialization(self):
-        # Initialize tabu list
-        self.tabu_list = np.zeros(
-            (self.n_ants, self.cities_distance.shape[0]),
-            dtype=int,
-        )
-        # Setup random variable generator
-        self.random_variable.values = self.cities
-        self.random_variable.weights = np.ones(self.cities.shape)
+    @property
+    def beta(self) -> float:
+        return self._beta
+
+    @beta.setter
+    def beta(self, beta: float):
+        self._beta = beta
+        self.heuristic = heuristic_matrix(self.cities_distance, beta)
 
+    def _allocate_buffers(self):
+        # Per-cycle working buffers, reused by every cycle and only
+        # reallocated when the number of cities (or ants) changes
+        n_cities = self.cities_distance.shape[0]
+        city_dtype = np.min_scalar_type(max(n_cities - 1, 0))
+        self.tabu_list = np.zeros((self.n_ants, n_cities), dtype=city_dtype)
+        # Unvisited cities of the current ant, compacted at the front,
+        # and the index of each city within that array. Both are intp so
+        # that np.take does not convert the indices on every step
+        self._unvisited = np.zeros(n_cities, dtype=np.intp)
+        self._unvisited_index = np.zeros(n_cities, dtype=np.intp)
+        self._pheromone_buffer = np.zeros(n_cities)
+        self._heuristic_buffer = np.zeros(n_cities)
+
+    def initialization(self):
+        if self.tabu_list.shape[0] != self.n_ants:
+            self.tabu_list = np.zeros(
+                (self.n_ants, len(self.cities)), dtype=self.tabu_list.dtype
+            )
         # Place ants randomly on the graph
-        self.tabu_list[:, 0] = [self.random_variable.next() for _ in range(self.n_ants)]
+        generator = self.random_variable.generator
+        n_cities = len(self.cities)
+        for ant in range(self.n_ants):
+            self.tabu_list[ant, 0] = min(int(generator.next() * n_cities), n_cities - 1)
 
     def cost(self, solution: np.ndarray) -> float:
         """Return the cost of a solution.
@@ -75,7 +125,8 @@ class AntSystem:
         return cost
 
     def next_city(self, ant: int, city: int):
-        """Return the next city to visit by an ant.
+        """Return the next city to visit by an ant and mark it as \
+        visited.
 
         Parameters
         ----------
@@ -84,21 +135,42 @@ class AntSystem:
         city : int
             The current city index of the tabu list.
         """
-        visited_cities = self.tabu_list[ant, :city]
-        current_city = visited_cities[-1]
-        unvisited_cities = np.setdiff1d(self.cities, visited_cities)
-        pheromone = self.pheromone[current_city, unvisited_cities]
-        heuristic = self.cities_distance[current_city, unvisited_cities]
-        heuristic = 1 / heuristic
-        probabilities = (pheromone**self.alpha) * (heuristic**self.beta)
-        probabilities = probabilities / probabilities.sum()
-        # Setup random variable generator
-        self.random_variable.values = unvisited_cities
-        self.random_variable.weights = probabilities
-        return self.random_variable.next()
+        current_city = self.tabu_list[ant, city - 1]
+        n_unvisited = self.cities_distance.shape[0] - city
+        unvisited_cities = self._unvisited[:n_unvisited]
+        pheromone = self._pheromone_buffer[:n_unvisited]
+        heuristic = self._heuristic_buffer[:n_unvisited]
+        pheromone_row = self.pheromone[current_city]
+        heuristic_row = self.heuristic[current_city]
+        np.take(pheromone_row, unvisited_cities, out=pheromone, mode="clip")
+        np.take(heuristic_row, unvisited_cities, out=heuristic, mode="clip")
+        # probabilities = pheromone^alpha * (1 / distance)^beta
+        np.power(pheromone, self.alpha, out=pheromone)
+        weights = np.multiply(pheromone, heuristic, out=pheromone)
+        # Sample from the cumulative weights directly: the first city whose
+        # cumulative weight exceeds u * total (zero weights are never chosen)
+        cumulative_weights = np.cumsum(weights, out=heuristic)
+        u = self.random_variable.generator.next() * cumulative_weights[-1]
+        index = cumulative_weights.searchsorted(u, side="right")
+        next_city = unvisited_cities[min(index, n_unvisited - 1)]
+        self._visit(next_city, n_unvisited)
+        return next_city
+
+    def _reset_unvisited(self, ant: int):
+        self._unvisited[:] = self.cities
+        self._unvisited_index[:] = self.cities
+        self._visit(self.tabu_list[ant, 0], len(self.cities))
+
+    def _visit(self, city: int, n_unvisited: int):
+        # Move the last unvisited city into the slot of the visited one
+        index = self._unvisited_index[city]
+        last_city = self._unvisited[n_unvisited - 1]
+        self._unvisited[index] = last_city
+        self._unvisited_index[last_city] = index
 
     def cycle(self):
         for ant in range(self.n_ants):
+            self._reset_unvisited(ant)
             for city in range(1, self.cities_distance.shape[0]):
                 self.tabu_list[ant, city] = self.next_city(ant, city)
 
@@ -115,7 +187,8 @@ class AntSystem:
         self._cycle_best_solution_cost = cycle_best_solution_cost
         # Update overall best solution
         if cycle_best_solution_cost < self.best_solution_cost:
-            self.best_solution = cycle_best_solution
+            # Copy, since the tabu list is overwritten in the next cycle
+            self.best_solution = cycle_best_solution.copy()
             self.best_solution_cost = cycle_best_solution_cost
 
     def update_pheromone(self):
@@ -129,14 +202,188 @@ class AntSystem:
                 1 / self._cycle_best_solution_cost
             )
 
+    def seed_solution(self, solution: np.ndarray, strength: float = 1.0):
+        """Bias the pheromone towards the edges of a known solution.
+
+        The pheromone is reset to ones and ``strength`` is added to \
+        every edge of ``solution`` (in both directions). The solution \
+        becomes the current best solution, so a warm started run \
+        never returns anything worse.
+
+        Parameters
+        ----------
+        solution : np.ndarray
+            A previous solution, i.e. a permutation of the cities.
+        strength : float
+            Pheromone added to each edge of the solution.
+        """
+        solution = np.asarray(solution)
+        if np.sort(solution).tolist() != self.cities.tolist():
+            raise ValueError("'solution' must be a permutation of the cities")
+        self.pheromone = np.ones(self.cities_distance.shape)
+        edges_from, edges_to = solution[:-1], solution[1:]
+        if self.round_trip:
+            edges_from = np.append(edges_from, solution[-1])
+            edges_to = np.append(edges_to, solution[0])
+        self.pheromone[edges_from, edges_to] += strength
+        self.pheromone[edges_to, edges_from] += strength
+        self.best_solution = solution.astype(self.tabu_list.dtype)
+        self.best_solution_cost = self.cost(solution)
+
+    def load_pheromone(self, pheromone: np.ndarray):
+        """Replace the pheromone matrix, e.g. with one saved from a \
+        previous run.
+
+        Parameters
+        ----------
+        pheromone : np.ndarray
+            A square matrix of shape (n_cities, n_cities).
+        """
+        pheromone = np.asarray(pheromone, dtype=float)
+        if pheromone.shape != self.cities_distance.shape:
+            raise ValueError("'pheromone' must have shape (n_cities, n_cities)")
+        self.pheromone = pheromone.copy()
+
+    def add_city(self, distances: np.ndarray) -> int:
+        """Add a city to the instance and return its index.
+
+        The new city starts with the mean pheromone of the graph. If \
+        there is a best solution, the city is inserted where it \
+        increases its cost the least.
+
+        Parameters
+        ----------
+        distances : np.ndarray
+            Distance from each existing city to the new city.
+        """
+        distances = np.asarray(distances, dtype=float)
+        n_cities = self.cities_distance.shape[0]
+        if distances.shape != (n_cities,):
+            raise ValueError("'distances' must have shape (n_cities,)")
+        self.cities_distance = np.pad(self.cities_distance, ((0, 1), (0, 1)))
+        self.cities_distance[n_cities, :n_cities] = distances
+        self.cities_distance[:n_cities, n_cities] = distances
+        self.pheromone = np.pad(
+            self.pheromone, ((0, 1), (0, 1)), constant_values=self.pheromone.mean()
+        )
+        self.cities = np.arange(n_cities + 1)
+        self.heuristic = heuristic_matrix(self.cities_distance, self.beta)
+        self._allocate_buffers()
+        if self.best_solution is not None:
+            solution = self._cheapest_insertion(self.best_solution, n_cities)
+            self.best_solution = solution.astype(self.tabu_list.dtype)
+            self.best_solution_cost = self.cost(self.best_solution)
+        return n_cities
+
+    def remove_city(self, city: int):
+        """Remove a city from the instance. Cities with a greater \
+        index are shifted down by one.
+
+        Parameters
+        ----------
+        city : int
+            Index of the city to remove.
+        """
+        self._check_city(city)
+        self.cities_distance = np.delete(
+            np.delete(self.cities_distance, city, axis=0), city, axis=1
+        )
+        self.pheromone = np.delete(
+            np.delete(self.pheromone, city, axis=0), city, axis=1
+        )
+        self.cities = np.arange(self.cities_distance.shape[0])
+        self.heuristic = np.delete(
+            np.delete(self.heuristic, city, axis=0), city, axis=1
+        )
+        self._allocate_buffers()
+        if self.best_solution is not None:
+            solution = self.best_solution[self.best_solution != city]
+            solution = np.where(solution > city, solution - 1, solution)
+            self.best_solution = solution.astype(self.tabu_list.dtype)
+            self.best_solution_cost = self.cost(self.best_solution)
+
+    def move_city(self, city: int, distances: np.ndarray):
+        """Update the distances of a city that has moved.
+
+        Parameters
+        ----------
+        city : int
+            Index of the city that has moved.
+        distances : np.ndarray
+            Distance from each city to the moved city.
+        """
+        self._check_city(city)
+        distances = np.asarray(distances, dtype=float)
+        if distances.shape != (self.cities_distance.shape[0],):
+            raise ValueError("'distances' must have shape (n_cities,)")
+        # Copy, the matrix may be shared with the caller
+        self.cities_distance = self.cities_distance.copy()
+        self.cities_distance[city, :] = distances
+        self.cities_distance[:, city] = distances
+        self.cities_distance[city, city] = 0
+        self.heuristic = heuristic_matrix(self.cities_distance, self.beta)
+        if self.best_solution is not None:
+            self.best_solution_cost = self.cost(self.best_solution)
+
+    def _check_city(self, city: int):
+        if not 0 <= city < self.cities_distance.shape[0]:
+            raise ValueError("'city' must be in range(n_cities)")
+
+    def _cheapest_insertion(self, solution: np.ndarray, city: int) -> np.ndarray:
+        # Cost increase of inserting the city before each position
+        distance = self.cities_distance
+        previous_cities, next_cities = solution[:-1], solution[1:]
+        increase = (
+            distance[previous_cities, city]
+            + distance[city, next_cities]
+            - distance[previous_cities, next_cities]
+        )
+        if self.round_trip:
+            # Inserting at either end closes the tour through the new city
+            end_increase = (
+                distance[solution[-1], city]
+                + distance[city, solution[0]]
+                - distance[solution[-1], solution[0]]
+            )
+            increase = np.concatenate(([end_increase], increase, [end_increase]))
+        else:
+            start_increase = distance[city, solution[0]]
+            end_increase = distance[solution[-1], city]
+            increase = np.concatenate(([start_increase], increase, [end_increase]))
+        # Insert on a wide dtype, the new city may not fit in the tour dtype
+        return np.insert(solution.astype(np.intp), np.argmin(increase), city)
+
     def _refresh_result(self):
         self.best_solution = None
         self.best_solution_cost = np.inf
         self._cycle_best_solution = None
         self._cycle_best_solution_cost = np.inf
 
-    def run(self, max_cycles: int, verbose: bool = False):
-        self._refresh_result()
+    def run(
+        self,
+        max_cycles: int,
+        verbose: bool = False,
+        warm_start: bool = False,
+        callback: Callable[[int], bool] = None,
+    ):
+        """Run the algorithm and return the best solution found.
+
+        Parameters
+        ----------
+        max_cycles : int
+            Number of cycles.
+        verbose : bool
+            If True, print the best cost after each cycle.
+        warm_start : bool
+            If True, keep the current pheromone and best solution \
+            (see ``seed_solution`` and ``load_pheromone``) instead \
+            of starting from scratch.
+        callback : Callable[[int], bool]
+            Called with the cycle number after each cycle. If it \
+            returns True, the run stops early.
+        """
+        if not warm_start:
+            self._refresh_result()
         for i in range(max_cycles):
             self.initialization()
             self.cycle()
@@ -144,4 +391,6 @@ class AntSystem:
             self.update_pheromone()
             if verbose:
                 print(f"Iteration {i + 1}: {self.best_solution_cost}")
+            if callback is not None and callback(i + 1):
+                break
         return self.best_solution
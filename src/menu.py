@@ -84,8 +84,9 @@ class RandomnessTestMenu:
         rng = np.random.default_rng(seed=seed)
         random_numbers = rng.random(n)
 
-        # Get statistic
-        statistic = float(input("Ingrese el valor del estadístico de la tabla: "))
+        # Get statistic (if empty, it is computed for alpha = 0.05)
+        statistic = input("Ingrese el valor del estadístico de la tabla: ")
+        statistic = float(statistic) if statistic else None
 
         # Get Generator
         if option == 1:
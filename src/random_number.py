@@ -1,3 +1,4 @@
+import numpy as np
 from abc import ABC
 from abc import abstractmethod
 from matplotlib import pyplot as plt
@@ -40,6 +41,10 @@ class Generator(ABC):
     def next(self):
         pass
 
+    def next_array(self, size: int) -> np.ndarray:
+        """Return the next ``size`` random numbers as an array."""
+        return np.fromiter((self.next() for _ in range(size)), dtype=float, count=size)
+
     def plot_random_numbers(self, join_points=True):
         _, axes = plt.subplots()
         rand_nums = self.get_random_numbers()
@@ -96,6 +101,30 @@ class LinearCongruentialGenerator(Generator):
         self.current_xn = (self.a * self.current_xn + self.b) % self.m
         return self.current_xn / self.m
 
+    def next_array(self, size: int) -> np.ndarray:
+        # Leapfrog: x_{i+k} = (A x_i + B) mod m with A = a^k mod m and
+        # B = b (a^{k-1} + ... + 1) mod m, so k lanes advance at once.
+        # A x_i + B fits in uint64 as long as m <= 2^32.
+        if self.m > 2**32 or size < 2:
+            return super().next_array(size)
+        lanes = min(size, 1024)
+        xn = np.empty(size, dtype=np.uint64)
+        for i in range(lanes):
+            self.next()
+            xn[i] = self.current_xn
+        a_k, b_k = 1, 0
+        for _ in range(lanes):
+            a_k, b_k = (self.a * a_k) % self.m, (self.a * b_k + self.b) % self.m
+        a_k, b_k, m = np.uint64(a_k), np.uint64(b_k), np.uint64(self.m)
+        for start in range(lanes, size, lanes):
+            end = min(start + lanes, size)
+            previous = xn[start - lanes : end - lanes]
+            np.multiply(previous, a_k, out=xn[start:end])
+            xn[start:end] += b_k
+            xn[start:end] %= m
+        self.current_xn = int(xn[-1])
+        return xn / self.m
+
     @abstractmethod
     def has_max_sequence(self):
         pass
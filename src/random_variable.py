@@ -1,5 +1,6 @@
+import numpy as np
 from abc import ABC, abstractmethod
-from typing import Callable
+from typing import Callable, Iterator
 from src.random_number import Generator
 
 
@@ -101,3 +102,111 @@ class AcceptanceRejectionVariable(RandomVariable):
             x = self.a + (self.b - self.a) * u1
             if u2 <= self.f(x) / (self.M * self.g(x)):
                 return x
+
+
+class InverseTransformRandomVariable(RandomVariable):
+    def __init__(self, generator: Generator, chunk_size: int = 2**16):
+        self.generator = generator
+        self.chunk_size = chunk_size
+
+    @abstractmethod
+    def _transform(self, random_numbers: np.ndarray) -> np.ndarray:
+        """Map an array of random numbers to an array of random \
+        variables of the same length."""
+        pass
+
+    def get_random_variables(self):
+        return self._transform(np.array(self.generator.get_random_numbers())).tolist()
+
+    def next(self):
+        return self.next_array(1)[0]
+
+    def next_array(self, size: int) -> np.ndarray:
+        return self._transform(self.generator.next_array(size))
+
+    def stream(self, size: int) -> Iterator[np.ndarray]:
+        """Yield ``size`` random variables in chunks of at most \
+        ``chunk_size`` values, keeping memory bounded."""
+        for start in range(0, size, self.chunk_size):
+            yield self.next_array(min(self.chunk_size, size - start))
+
+
+class ExponentialRandomVariable(InverseTransformRandomVariable):
+    def __init__(self, generator: Generator, lambd: float, chunk_size: int = 2**16):
+        if lambd <= 0:
+            raise ValueError("'lambd' must be greater than 0")
+        super().__init__(generator, chunk_size)
+        self.lambd = lambd
+
+    def _transform(self, random_numbers: np.ndarray) -> np.ndarray:
+        # F^-1(u) = -ln(1 - u) / lambda
+        return -np.log1p(-random_numbers) / self.lambd
+
+
+class NormalRandomVariable(InverseTransformRandomVariable):
+    def __init__(
+        self, generator: Generator, mu: float, sigma: float, chunk_size: int = 2**16
+    ):
+        if sigma <= 0:
+            raise ValueError("'sigma' must be greater than 0")
+        super().__init__(generator, chunk_size)
+        self.mu = mu
+        self.sigma = sigma
+        # Second normal of the last Box-Muller pair, if it was not used
+        self._spare = np.empty(0)
+
+    def _transform(self, random_numbers: np.ndarray) -> np.ndarray:
+        # Box-Muller: each pair (u1, u2) gives two independent normals
+        u1, u2 = random_numbers[0::2], random_numbers[1::2]
+        radius = np.sqrt(-2 * np.log1p(-u1))  # 1 - u1 is in (0, 1]
+        angle = 2 * np.pi * u2
+        z = np.empty(len(random_numbers))
+        z[0::2] = radius * np.cos(angle)
+        z[1::2] = radius * np.sin(angle)
+        return self.mu + self.sigma * z
+
+    def get_random_variables(self):
+        # An odd trailing random number has no pair and is dropped
+        random_numbers = np.array(self.generator.get_random_numbers())
+        random_numbers = random_numbers[: len(random_numbers) // 2 * 2]
+        return self._transform(random_numbers).tolist()
+
+    def next_array(self, size: int) -> np.ndarray:
+        missing = size - len(self._spare)
+        if missing <= 0:
+            values, self._spare = self._spare[:size], self._spare[size:]
+            return values
+        new_values = self._transform(self.generator.next_array(missing + missing % 2))
+        values = np.concatenate((self._spare, new_values[:missing]))
+        self._spare = new_values[missing:]
+        return values
+
+
+class EmpiricalRandomVariable(InverseTransformRandomVariable):
+    def __init__(
+        self, generator: Generator, values: list[float], chunk_size: int = 2**16
+    ):
+        """Piecewise-linear empirical distribution.
+
+        Parameters
+        ----------
+        generator : Generator
+            Random number generator.
+        values : list[float]
+            Observed values. The CDF goes linearly from (i - 1) / (n - 1) \
+            to i / (n - 1) between the i-th and (i + 1)-th sorted values, \
+            so the sorted values are an exact inverse CDF table.
+        chunk_size : int
+            Maximum number of values generated at once by ``stream``.
+        """
+        if len(values) < 2:
+            raise ValueError("'values' must have at least 2 elements")
+        super().__init__(generator, chunk_size)
+        self.values = np.sort(values)
+
+    def _transform(self, random_numbers: np.ndarray) -> np.ndarray:
+        position = random_numbers * (len(self.values) - 1)
+        # u = 1 falls on the last knot, interpolate it from the last segment
+        index = np.minimum(position.astype(np.intp), len(self.values) - 2)
+        lower = self.values[index]
+        return lower + (position - index) * (self.values[index + 1] - lower)
@@ -1,7 +1,10 @@
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from matplotlib import pyplot as plt
 from abc import ABC, abstractmethod
+from scipy import stats
 from src import utils
+from src.random_number import Generator
 
 
 class RandomnessTest(ABC):
@@ -9,11 +12,35 @@ class RandomnessTest(ABC):
     def run_test(self) -> None:
         pass
 
+    @property
+    @abstractmethod
+    def value(self) -> float:
+        pass
+
+    @property
+    @abstractmethod
+    def p_value(self) -> float:
+        pass
+
+    @property
+    @abstractmethod
+    def passed(self) -> bool:
+        pass
+
 
 class ChiSquaredTest(RandomnessTest):
-    def __init__(self, random_numbers: list[float], intervals: int, statistic: float):
+    def __init__(
+        self,
+        random_numbers: list[float],
+        intervals: int,
+        statistic: float = None,
+        alpha: float = 0.05,
+    ):
         self.random_numbers = np.array(random_numbers)
         self.intervals = intervals
+        self.alpha = alpha
+        if statistic is None:
+            statistic = stats.chi2.ppf(1 - alpha, intervals - 1)
         self.statistic = statistic
         self.x0 = self._get_x0()
 
@@ -26,6 +53,18 @@ class ChiSquaredTest(RandomnessTest):
         chi_squared = np.sum((expected_freq - observed_freq) ** 2) / ef
         return chi_squared
 
+    @property
+    def value(self) -> float:
+        return self.x0
+
+    @property
+    def p_value(self) -> float:
+        return stats.chi2.sf(self.x0, self.intervals - 1)
+
+    @property
+    def passed(self) -> bool:
+        return self.x0 < self.statistic
+
     def run_test(self):
         statistic_text = r"\chi^2_{(\alpha, k=" + f"{self.intervals-1}" + r")}"
 
@@ -46,9 +85,14 @@ class ChiSquaredTest(RandomnessTest):
 
 
 class KolmogorovSmirnovTest(RandomnessTest):
-    def __init__(self, random_numbers: list[float], statistic: float):
+    def __init__(
+        self, random_numbers: list[float], statistic: float = None, alpha: float = 0.05
+    ):
         self.random_numbers = np.array(random_numbers)
         self.sorted_random_numbers = np.sort(random_numbers)
+        self.alpha = alpha
+        if statistic is None:
+            statistic = stats.kstwo.ppf(1 - alpha, len(self.random_numbers))
         self.statistic = statistic
         self.distance = self._get_distance()
 
@@ -64,8 +108,21 @@ class KolmogorovSmirnovTest(RandomnessTest):
 
     def _get_distance(self):
         n = len(self.random_numbers)
-        d = np.max(np.arange(1, n + 1) / n - self.sorted_random_numbers)
-        return d
+        d_plus = np.max(np.arange(1, n + 1) / n - self.sorted_random_numbers)
+        d_minus = np.max(self.sorted_random_numbers - np.arange(n) / n)
+        return max(d_plus, d_minus)
+
+    @property
+    def value(self) -> float:
+        return self.distance
+
+    @property
+    def p_value(self) -> float:
+        return stats.kstwo.sf(self.distance, len(self.random_numbers))
+
+    @property
+    def passed(self) -> bool:
+        return self.distance < self.statistic
 
     def run_test(self):
         # Print results
@@ -85,8 +142,13 @@ class KolmogorovSmirnovTest(RandomnessTest):
 
 
 class WaldWolfowitzRunsTest(RandomnessTest):
-    def __init__(self, random_numbers: list[float], statistic: float):
+    def __init__(
+        self, random_numbers: list[float], statistic: float = None, alpha: float = 0.05
+    ):
         self.random_numbers = np.array(random_numbers)
+        self.alpha = alpha
+        if statistic is None:
+            statistic = stats.norm.ppf(1 - alpha / 2)
         self.statistic = statistic
         self.runs, self.positive, self.negative = self._get_runs()
         self.z = self._get_z()
@@ -107,7 +169,7 @@ class WaldWolfowitzRunsTest(RandomnessTest):
         total_runs = len(self.runs)
         positive, negative = self.positive, self.negative
         total_random_numbers = positive + negative
-        mean = 2 * positive * negative / total_random_numbers + 1 / 2
+        mean = 2 * positive * negative / total_random_numbers + 1
         variance = (
             2 * positive * negative * (2 * positive * negative - total_random_numbers)
         )
@@ -115,6 +177,18 @@ class WaldWolfowitzRunsTest(RandomnessTest):
         z = (total_runs - mean) / np.sqrt(variance)
         return z
 
+    @property
+    def value(self) -> float:
+        return self.z
+
+    @property
+    def p_value(self) -> float:
+        return 2 * stats.norm.sf(np.abs(self.z))
+
+    @property
+    def passed(self) -> bool:
+        return np.abs(self.z) <= self.statistic
+
     def run_test(self) -> None:
         runs_text = " ".join([str(run) for run in self.runs])
         statistic_text = r"$Z_{\alpha/2}$"
@@ -138,3 +212,225 @@ class WaldWolfowitzRunsTest(RandomnessTest):
             utils.print_markdown(
                 f"$Z_0 <$ -{statistic_text} $\\Rightarrow$ La hipótesis se rechaza."
             )
+
+
+class SerialCorrelationTest(RandomnessTest):
+    def __init__(
+        self,
+        random_numbers: list[float],
+        lag: int = 1,
+        statistic: float = None,
+        alpha: float = 0.05,
+    ):
+        self.random_numbers = np.array(random_numbers)
+        if lag < 1 or lag >= len(self.random_numbers):
+            raise ValueError("'lag' must be at least 1 and less than the sample size")
+        self.lag = lag
+        self.alpha = alpha
+        if statistic is None:
+            statistic = stats.norm.ppf(1 - alpha / 2)
+        self.statistic = statistic
+        self.rho, self.sigma = self._get_rho()
+        self.z = self.rho / self.sigma
+
+    def _get_rho(self) -> tuple[float, float]:
+        # M + 1 pairs (mu_i, mu_{i+lag}) are compared
+        m = len(self.random_numbers) - self.lag - 1
+        products = self.random_numbers[: -self.lag] * self.random_numbers[self.lag :]
+        rho = products.sum() / (m + 1) - 0.25
+        sigma = np.sqrt(13 * m + 7) / (12 * (m + 1))
+        return rho, sigma
+
+    @property
+    def value(self) -> float:
+        return self.z
+
+    @property
+    def p_value(self) -> float:
+        return 2 * stats.norm.sf(np.abs(self.z))
+
+    @property
+    def passed(self) -> bool:
+        return np.abs(self.z) <= self.statistic
+
+    def run_test(self) -> None:
+        statistic_text = r"$Z_{\alpha/2}$"
+
+        utils.print_markdown(
+            r"$\hat{\rho} = \frac{1}{M + 1} \sum_{k=1}^{M+1} \mu_k \mu_{k+\ell}"
+            + r" - 0.25"
+            + f" = {self.rho}$ ($\\ell = {self.lag}$)"
+        )
+        utils.print_markdown(f"{statistic_text} = {self.statistic}")
+        utils.print_markdown(
+            r"$Z_0 = \frac{\hat{\rho}}{\sigma_{\hat{\rho}}}" + f" = {self.z}$"
+        )
+
+        if self.passed:
+            utils.print_markdown(
+                f"-{statistic_text} $\\leq Z_0 \\leq$ {statistic_text} $\\Rightarrow$ La hipótesis se acepta."
+            )
+        else:
+            utils.print_markdown(
+                f"$|Z_0| >$ {statistic_text} $\\Rightarrow$ La hipótesis se rechaza."
+            )
+
+
+class GapTest(RandomnessTest):
+    def __init__(
+        self,
+        random_numbers: list[float],
+        a: float = 0.0,
+        b: float = 0.5,
+        max_gap: int = 5,
+        statistic: float = None,
+        alpha: float = 0.05,
+    ):
+        self.random_numbers = np.array(random_numbers)
+        self.a = a
+        self.b = b
+        self.max_gap = max_gap
+        self.alpha = alpha
+        if statistic is None:
+            statistic = stats.chi2.ppf(1 - alpha, max_gap)
+        self.statistic = statistic
+        self.gaps = self._get_gaps()
+        self.x0 = self._get_x0()
+
+    def _get_gaps(self) -> np.ndarray:
+        in_interval = (self.random_numbers >= self.a) & (self.random_numbers < self.b)
+        positions = np.flatnonzero(in_interval)
+        return np.diff(positions) - 1
+
+    def _get_x0(self) -> float:
+        # Without gaps (fewer than two numbers in [a, b)) there is nothing
+        # to compare, which is treated as the strongest evidence against
+        # randomness rather than left as NaN
+        if len(self.gaps) == 0:
+            return np.inf
+        # Gaps of length 0, 1, ..., max_gap - 1 and >= max_gap
+        observed_freq = np.bincount(
+            np.minimum(self.gaps, self.max_gap), minlength=self.max_gap + 1
+        )
+        p = self.b - self.a
+        expected_prob = p * (1 - p) ** np.arange(self.max_gap + 1)
+        expected_prob[-1] = (1 - p) ** self.max_gap
+        expected_freq = len(self.gaps) * expected_prob
+        return np.sum((observed_freq - expected_freq) ** 2 / expected_freq)
+
+    @property
+    def value(self) -> float:
+        return self.x0
+
+    @property
+    def p_value(self) -> float:
+        return stats.chi2.sf(self.x0, self.max_gap)
+
+    @property
+    def passed(self) -> bool:
+        return self.x0 < self.statistic
+
+    def run_test(self) -> None:
+        statistic_text = r"\chi^2_{(\alpha, k=" + f"{self.max_gap}" + r")}"
+
+        utils.print_markdown(
+            f"$[{self.a}, {self.b})$: {len(self.gaps)} huecos observados"
+        )
+        utils.print_markdown(
+            r"$\chi^2_0 = \sum_{i=0}^t \frac{({FO}_i - {FE}_i)^2}{{FE}_i} ="
+            + f" {self.x0}$"
+        )
+        utils.print_markdown(f"${statistic_text} = {self.statistic}$")
+
+        if self.passed:
+            utils.print_markdown(
+                f"$\\chi^2_0 <  {statistic_text} \\Rightarrow$ La hipótesis se acepta."
+            )
+        else:
+            utils.print_markdown(
+                f"$\\chi^2_0 >  {statistic_text} \\Rightarrow$ La hipótesis se rechaza."
+            )
+
+
+BATTERY_DTYPE = np.dtype(
+    [
+        ("sample", np.int64),
+        ("test", "U32"),
+        ("value", np.float64),
+        ("statistic", np.float64),
+        ("p_value", np.float64),
+        ("passed", np.bool_),
+    ]
+)
+
+
+def _run_battery_on_sample(
+    index: int,
+    sample: Generator | list[float],
+    alpha: float,
+    intervals: int,
+    sample_size: int,
+) -> list[tuple]:
+    if isinstance(sample, Generator):
+        # Same values as calling next() sample_size times
+        sample = sample.next_array(sample_size)
+    tests = [
+        ChiSquaredTest(sample, intervals, alpha=alpha),
+        KolmogorovSmirnovTest(sample, alpha=alpha),
+        WaldWolfowitzRunsTest(sample, alpha=alpha),
+        SerialCorrelationTest(sample, alpha=alpha),
+        GapTest(sample, alpha=alpha),
+    ]
+    return [
+        (
+            index,
+            type(test).__name__,
+            test.value,
+            test.statistic,
+            test.p_value,
+            test.passed,
+        )
+        for test in tests
+    ]
+
+
+def run_battery(
+    samples: list[Generator | list[float]],
+    alpha: float = 0.05,
+    intervals: int = 10,
+    sample_size: int = 10000,
+    max_workers: int = None,
+) -> np.ndarray:
+    """Run every randomness test over many samples in parallel.
+
+    Parameters
+    ----------
+    samples : list[Generator | list[float]]
+        Generators or sequences of random numbers. Generators are \
+        copied into the worker processes, so they are not advanced: \
+        running the battery again tests the same numbers unless they \
+        are reseeded.
+    alpha : float
+        Significance level used to compute the critical values.
+    intervals : int
+        Number of intervals of the chi-squared test.
+    sample_size : int
+        Number of random numbers drawn from each generator.
+    max_workers : int
+        Number of worker processes. If None, as many as CPUs.
+
+    Returns
+    -------
+    np.ndarray
+        Structured array with one row per (sample, test) and the \
+        fields of BATTERY_DTYPE.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _run_battery_on_sample, i, sample, alpha, intervals, sample_size
+            )
+            for i, sample in enumerate(samples)
+        ]
+        rows = [row for future in futures for row in future.result()]
+    return np.array(rows, dtype=BATTERY_DTYPE)
@@ -0,0 +1,333 @@
+import asyncio
+import hashlib
+import itertools
+import multiprocessing
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable
+from src.ant_system import AntSystem, heuristic_matrix
+from src.random_number import MixedCongruentialGenerator
+from src.random_variable import DiscreteRandomVariable
+
+# Full period mixed congruential generator used by every solve request
+_LCG_PARAMETERS = {"a": 1103515245, "b": 12345, "m": 2**31}
+
+# Worker process state, set up by _init_worker
+_worker_queue = None
+_worker_cancelled = None
+_worker_instances = None
+_worker_cache_size = 0
+_worker_distances: OrderedDict = OrderedDict()
+_worker_heuristics: OrderedDict = OrderedDict()
+
+
+def _init_worker(queue, cancelled, instances, cache_size: int):
+    global _worker_queue, _worker_cancelled, _worker_instances, _worker_cache_size
+    _worker_queue = queue
+    _worker_cancelled = cancelled
+    _worker_instances = instances
+    _worker_cache_size = cache_size
+
+
+def _cached(cache: OrderedDict, key, compute: Callable):
+    # Least recently used cache holding at most _worker_cache_size items
+    if key not in cache:
+        cache[key] = compute()
+        while len(cache) > _worker_cache_size:
+            cache.popitem(last=False)
+    cache.move_to_end(key)
+    return cache[key]
+
+
+def _get_instance(key: str, beta: float) -> tuple[np.ndarray, np.ndarray]:
+    # Only the key is sent with each request, the distance matrix is
+    # fetched from the shared instances on a cache miss
+    distance = _cached(_worker_distances, key, lambda: _worker_instances[key])
+    heuristic = _cached(
+        _worker_heuristics, (key, beta), lambda: heuristic_matrix(distance, beta)
+    )
+    return distance, heuristic
+
+
+def _solve_request(key: str, request: dict):
+    # Progress and the result are sent through the queue, the return
+    # value of the pool task is only used to report exceptions
+    request_id = request["request_id"]
+    if request_id in _worker_cancelled:
+        _worker_queue.put(("done", request_id, None, np.inf, "cancelled"))
+        return
+    distance, heuristic = _get_instance(key, request["beta"])
+    random_variable = DiscreteRandomVariable(
+        MixedCongruentialGenerator(seed=request["seed"], **_LCG_PARAMETERS),
+        [],
+        [],
+    )
+    ant_system = AntSystem(
+        distance,
+        request["alpha"],
+        request["beta"],
+        request["evaporation_rate"],
+        request["n_ants"],
+        request["round_trip"],
+        random_variable,
+        heuristic=heuristic,
+    )
+    status = "completed"
+    reported_cost = np.inf
+
+    def stop() -> bool:
+        nonlocal status
+        if request["deadline"] is not None and time.time() >= request["deadline"]:
+            status = "expired"
+        elif request_id in _worker_cancelled:
+            status = "cancelled"
+        return status != "completed"
+
+    def on_cycle(cycle: int) -> bool:
+        nonlocal reported_cost
+        if ant_system.best_solution_cost < reported_cost:
+            reported_cost = ant_system.best_solution_cost
+            _worker_queue.put(
+                (
+                    "progress",
+                    request_id,
+                    cycle,
+                    ant_system.best_solution,
+                    ant_system.best_solution_cost,
+                )
+            )
+        return stop()
+
+    if request["max_cycles"] > 0 and not stop():
+        ant_system.run(request["max_cycles"], callback=on_cycle)
+    _worker_queue.put(
+        (
+            "done",
+            request_id,
+            ant_system.best_solution,
+            ant_system.best_solution_cost,
+            status,
+        )
+    )
+
+
+def instance_key(cities_distance: np.ndarray) -> str:
+    """Return a content hash identifying a distance matrix."""
+    cities_distance = np.ascontiguousarray(cities_distance, dtype=float)
+    digest = hashlib.blake2b(str(cities_distance.shape).encode(), digest_size=16)
+    digest.update(cities_distance.data)
+    return digest.hexdigest()
+
+
+class AntSystemService:
+    def __init__(self, max_workers: int = None, cache_size: int = 32):
+        """Asynchronous Ant System solver running on a process pool.
+
+        Each request is a separate pool task, so requests for the \
+        same instance run in parallel. Instances are keyed by their \
+        content hash and stored once in a shared manager process. \
+        Requests only carry the key, and each worker caches the \
+        distance and heuristic matrices of the last ``cache_size`` \
+        instances it used.
+
+        Parameters
+        ----------
+        max_workers : int
+            Number of worker processes. If None, as many as CPUs.
+        cache_size : int
+            Number of instances cached by each worker, and of unused \
+            instances kept in the shared store.
+        """
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self._request_ids = itertools.count()
+        self._requests: dict[int, dict] = {}
+        # Instances in the shared store and how many requests use them
+        self._instance_users: OrderedDict[str, int] = OrderedDict()
+        self._request_keys: dict[int, str] = {}
+        self._loop: asyncio.AbstractEventLoop = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._manager = multiprocessing.Manager()
+        self._cancelled = self._manager.dict()
+        self._instances = self._manager.dict()
+        self._queue = multiprocessing.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self._queue, self._cancelled, self._instances, self.cache_size),
+        )
+        self._listener = threading.Thread(target=self._listen, daemon=True)
+        self._listener.start()
+
+    async def close(self):
+        await self._loop.run_in_executor(None, self._executor.shutdown)
+        self._queue.put(None)
+        await self._loop.run_in_executor(None, self._listener.join)
+        self._manager.shutdown()
+
+    async def solve(
+        self,
+        cities_distance: np.ndarray,
+        alpha: float,
+        beta: float,
+        evaporation_rate: float,
+        n_ants: int,
+        round_trip: bool,
+        max_cycles: int,
+        seed: int = 1,
+        deadline: float = None,
+        on_progress: Callable[[int, np.ndarray, float], None] = None,
+    ) -> tuple[np.ndarray, float]:
+        """Solve an instance and return its best solution and cost.
+
+        Cancelling the awaiting task stops the request in its worker.
+
+        Parameters
+        ----------
+        cities_distance : np.ndarray
+            Distance matrix, see AntSystem.
+        alpha, beta, evaporation_rate, n_ants, round_trip
+            AntSystem parameters.
+        max_cycles : int
+            Number of cycles.
+        seed : int
+            Seed of the random number generator.
+        deadline : float
+            Seconds after which the best solution found so far is \
+            returned. If no solution was found yet, TimeoutError is \
+            raised.
+        on_progress : Callable[[int, np.ndarray, float], None]
+            Called with (cycle, best_solution, best_solution_cost) \
+            every time the best solution improves.
+        """
+        cities_distance = np.ascontiguousarray(cities_distance, dtype=float)
+        request_id = next(self._request_ids)
+        future = self._loop.create_future()
+        self._requests[request_id] = {
+            "future": future,
+            "on_progress": on_progress,
+            "best": None,
+            "timer": None,
+        }
+        if deadline is not None:
+            timer = self._loop.call_later(deadline, self._expire, request_id)
+            self._requests[request_id]["timer"] = timer
+            deadline = time.time() + deadline
+        self._submit(
+            self._acquire_instance(cities_distance),
+            {
+                "request_id": request_id,
+                "alpha": alpha,
+                "beta": beta,
+                "evaporation_rate": evaporation_rate,
+                "n_ants": n_ants,
+                "round_trip": round_trip,
+                "max_cycles": max_cycles,
+                "seed": seed,
+                "deadline": deadline,
+            },
+        )
+        try:
+            return await future
+        except asyncio.CancelledError:
+            self._cancel(request_id)
+            raise
+
+    def _acquire_instance(self, cities_distance: np.ndarray) -> str:
+        key = instance_key(cities_distance)
+        if key not in self._instance_users:
+            self._instances[key] = cities_distance
+            self._instance_users[key] = 0
+        self._instance_users[key] += 1
+        self._instance_users.move_to_end(key)
+        # Evict the least recently used instances no request is using
+        unused = [k for k, users in self._instance_users.items() if users == 0]
+        for unused_key in unused[: max(len(unused) - self.cache_size, 0)]:
+            del self._instance_users[unused_key]
+            del self._instances[unused_key]
+        return key
+
+    def _release_instance(self, request_id: int):
+        key = self._request_keys.pop(request_id, None)
+        if key is not None:
+            self._instance_users[key] -= 1
+
+    def _submit(self, key: str, request: dict):
+        self._request_keys[request["request_id"]] = key
+        future = self._loop.run_in_executor(
+            self._executor, _solve_request, key, request
+        )
+        future.add_done_callback(partial(self._task_done, request["request_id"]))
+
+    def _task_done(self, request_id: int, future: asyncio.Future):
+        if future.cancelled() or future.exception() is None:
+            return
+        self._release_instance(request_id)
+        request = self._pop_request(request_id)
+        if request is not None and not request["future"].done():
+            request["future"].set_exception(future.exception())
+
+    def _pop_request(self, request_id: int) -> dict:
+        request = self._requests.pop(request_id, None)
+        if request is not None and request["timer"] is not None:
+            request["timer"].cancel()
+        return request
+
+    def _cancel(self, request_id: int):
+        # The worker skips or stops the request and reports it as done,
+        # which removes it from the cancelled requests
+        self._pop_request(request_id)
+        self._cancelled[request_id] = True
+
+    def _expire(self, request_id: int):
+        request = self._requests.get(request_id)
+        if request is None:
+            return
+        self._cancel(request_id)
+        if request["best"] is None:
+            request["future"].set_exception(TimeoutError("No solution found yet"))
+        else:
+            request["future"].set_result(request["best"])
+
+    def _listen(self):
+        while True:
+            message = self._queue.get()
+            if message is None:
+                return
+            self._loop.call_soon_threadsafe(self._dispatch, message)
+
+    def _dispatch(self, message: tuple):
+        kind, request_id, *data = message
+        if kind == "done":
+            self._release_instance(request_id)
+            self._cancelled.pop(request_id, None)
+            request = self._pop_request(request_id)
+        else:
+            request = self._requests.get(request_id)
+        if request is None or request["future"].done():
+            return
+
+        if kind == "progress":
+            cycle, best_solution, best_solution_cost = data
+            request["best"] = (best_solution, best_solution_cost)
+            if request["on_progress"] is not None:
+                request["on_progress"](cycle, best_solution, best_solution_cost)
+        else:
+            best_solution, best_solution_cost, _ = data
+            if best_solution is None:
+                request["future"].set_exception(TimeoutError("No solution found yet"))
+            else:
+                request["future"].set_result((best_solution, best_solution_cost))
@@ -0,0 +1,111 @@
+import tracemalloc
+import numpy as np
+import pytest
+from src.ant_system import AntSystem
+from src.random_number import MixedCongruentialGenerator
+from src.random_variable import DiscreteRandomVariable
+
+
+def _dj38_ant_system() -> AntSystem:
+    cities = np.loadtxt("data/dj38.tsp", skiprows=1)
+    cities_distance = np.linalg.norm(
+        cities[:, np.newaxis] - cities[np.newaxis], axis=-1
+    )
+    random_variable = DiscreteRandomVariable(
+        MixedCongruentialGenerator(seed=1, a=1103515245, b=12345, m=2**31), [], []
+    )
+    return AntSystem(cities_distance, 1, 2, 0.1, 10, True, random_variable)
+
+
+def test_tabu_list_uses_smallest_unsigned_dtype():
+    ant_system = _dj38_ant_system()
+    ant_system.initialization()
+    ant_system.cycle()
+    assert ant_system.tabu_list.dtype == np.uint8
+    for solution in ant_system.tabu_list:
+        assert sorted(solution) == list(range(38))
+
+
+def test_cycle_reuses_buffers():
+    ant_system = _dj38_ant_system()
+    # Warm up, so that lazily created objects are not counted
+    ant_system.initialization()
+    ant_system.cycle()
+
+    # Peak memory allocated on top of what was already in use while the
+    # cycle runs, i.e. every temporary array made during the cycle
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    current, _ = tracemalloc.get_traced_memory()
+    ant_system.initialization()
+    ant_system.cycle()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    allocated = peak - current
+    assert allocated <= 4096, f"{allocated} bytes allocated during one cycle"
+
+
+def _random_ant_system(
+    n_cities: int, n_ants: int = 5
+) -> tuple[AntSystem, np.ndarray]:
+    cities = np.random.default_rng(0).random((n_cities + 1, 2))
+    cities_distance = np.linalg.norm(
+        cities[:, np.newaxis] - cities[np.newaxis], axis=-1
+    )
+    random_variable = DiscreteRandomVariable(
+        MixedCongruentialGenerator(seed=1, a=1103515245, b=12345, m=2**31), [], []
+    )
+    ant_system = AntSystem(
+        cities_distance[:n_cities, :n_cities], 1, 2, 0.1, n_ants, True, random_variable
+    )
+    # Distances from the first n_cities to one extra city
+    return ant_system, cities_distance[n_cities, :n_cities]
+
+
+def test_warm_start_is_never_worse():
+    ant_system = _dj38_ant_system()
+    ant_system.run(5)
+    best_solution_cost = ant_system.best_solution_cost
+
+    warm_started = _dj38_ant_system()
+    warm_started.seed_solution(ant_system.best_solution)
+    assert warm_started.best_solution_cost == pytest.approx(best_solution_cost)
+    warm_started.run(2, warm_start=True)
+    assert warm_started.best_solution_cost <= best_solution_cost
+
+
+def test_add_and_remove_city_across_dtype_boundary():
+    ant_system, distances = _random_ant_system(256, n_ants=1)
+    ant_system.seed_solution(np.arange(256))
+    assert ant_system.best_solution.dtype == np.uint8
+
+    city = ant_system.add_city(distances)
+    assert city == 256
+    assert ant_system.best_solution.dtype == np.uint16
+    assert sorted(ant_system.best_solution.tolist()) == list(range(257))
+    assert ant_system.best_solution_cost == ant_system.cost(ant_system.best_solution)
+
+    ant_system.remove_city(0)
+    assert ant_system.best_solution.dtype == np.uint8
+    assert sorted(ant_system.best_solution.tolist()) == list(range(256))
+    ant_system.run(1, warm_start=True)
+    assert sorted(ant_system.best_solution.tolist()) == list(range(256))
+
+
+def test_move_city_does_not_modify_caller_matrix():
+    ant_system, distances = _random_ant_system(10)
+    original = ant_system.cities_distance
+    expected = original.copy()
+    ant_system.move_city(3, distances)
+    assert np.array_equal(original, expected)
+    assert np.array_equal(ant_system.cities_distance[3, :3], distances[:3])
+
+
+@pytest.mark.parametrize("city", [-1, 10])
+def test_invalid_city_is_rejected(city):
+    ant_system, distances = _random_ant_system(10)
+    with pytest.raises(ValueError):
+        ant_system.remove_city(city)
+    with pytest.raises(ValueError):
+        ant_system.move_city(city, distances)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from src.random_number import MixedCongruentialGenerator
+from src.random_variable import (
+    EmpiricalRandomVariable,
+    ExponentialRandomVariable,
+    NormalRandomVariable,
+)
+
+
+def _generator() -> MixedCongruentialGenerator:
+    return MixedCongruentialGenerator(seed=1, a=1103515245, b=12345, m=2**31)
+
+
+@pytest.mark.parametrize("size", [1, 2, 1023, 1024, 3000])
+def test_next_array_matches_next(size):
+    generator, expected_generator = _generator(), _generator()
+    random_numbers = generator.next_array(size)
+    expected = [expected_generator.next() for _ in range(size)]
+    assert random_numbers.tolist() == expected
+    assert generator.current_xn == expected_generator.current_xn
+
+
+def test_exponential_moments():
+    random_variable = ExponentialRandomVariable(_generator(), lambd=2)
+    values = np.concatenate(list(random_variable.stream(10**6)))
+    assert len(values) == 10**6
+    assert values.mean() == pytest.approx(0.5, abs=5e-3)
+    assert values.std() == pytest.approx(0.5, abs=5e-3)
+
+
+def test_normal_moments():
+    values = NormalRandomVariable(_generator(), mu=5, sigma=2).next_array(10**6)
+    assert values.mean() == pytest.approx(5, abs=1e-2)
+    assert values.std() == pytest.approx(2, abs=1e-2)
+
+
+def test_normal_keeps_spare_variate():
+    random_variable = NormalRandomVariable(_generator(), mu=0, sigma=1)
+    values = [random_variable.next() for _ in range(3)]
+    values += random_variable.next_array(4).tolist()
+    expected = NormalRandomVariable(_generator(), mu=0, sigma=1).next_array(7)
+    assert values == pytest.approx(expected.tolist())
+
+
+def test_empirical_inverse_cdf_is_exact():
+    random_variable = EmpiricalRandomVariable(_generator(), [0, 10, 1])
+    values = random_variable._transform(np.array([0, 0.25, 0.5, 0.75, 1]))
+    assert values.tolist() == pytest.approx([0, 0.5, 1, 5.5, 10])
+
+
+def test_empirical_moments():
+    # Uniform mixture of [0, 1] and [1, 10]: mean (0.5 + 5.5) / 2
+    values = EmpiricalRandomVariable(_generator(), [0, 1, 10]).next_array(10**6)
+    assert values.mean() == pytest.approx(3, abs=2e-2)
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from scipy import stats
+from src import randomness_test
+from src.random_number import MixedCongruentialGenerator
+
+RANDOM_NUMBERS = [0.84, 0.87, 0.89, 0.42, 0.11, 0.64, 0.77, 0.53, 0.9, 0.1, 0.0]
+
+
+def test_critical_values_match_tables():
+    chi_squared = randomness_test.ChiSquaredTest(RANDOM_NUMBERS, intervals=4)
+    kolmogorov_smirnov = randomness_test.KolmogorovSmirnovTest(RANDOM_NUMBERS)
+    runs = randomness_test.WaldWolfowitzRunsTest(RANDOM_NUMBERS)
+    assert chi_squared.statistic == pytest.approx(7.815, abs=1e-3)
+    assert kolmogorov_smirnov.statistic == pytest.approx(0.391, abs=1e-3)
+    assert runs.statistic == pytest.approx(1.960, abs=1e-3)
+
+
+def test_table_statistic_is_kept():
+    test = randomness_test.ChiSquaredTest(RANDOM_NUMBERS, 4, statistic=7.779)
+    assert test.statistic == 7.779
+
+
+def test_kolmogorov_smirnov_distance_is_two_sided():
+    # D+ = 0.1 but D- = 0.5
+    test = randomness_test.KolmogorovSmirnovTest([0.5, 0.6, 0.9])
+    assert test.distance == pytest.approx(0.5)
+    expected = stats.kstest([0.5, 0.6, 0.9], "uniform")
+    assert test.p_value == pytest.approx(expected.pvalue)
+
+
+def test_runs_z():
+    # 4 runs, n1 = n2 = 2: mean 3, variance 2/3
+    test = randomness_test.WaldWolfowitzRunsTest([0.1, 0.9, 0.2, 0.8])
+    assert test.z == pytest.approx(1 / np.sqrt(2 / 3))
+
+
+def test_serial_correlation_statistic():
+    test = randomness_test.SerialCorrelationTest([0.2, 0.4, 0.6, 0.8])
+    assert test.rho == pytest.approx(0.8 / 3 - 0.25)
+    assert test.sigma == pytest.approx(np.sqrt(33) / 36)
+
+
+@pytest.mark.parametrize("lag", [0, 4])
+def test_serial_correlation_rejects_invalid_lag(lag):
+    with pytest.raises(ValueError):
+        randomness_test.SerialCorrelationTest([0.2, 0.4, 0.6, 0.8], lag=lag)
+
+
+def test_gap_statistic():
+    # Gaps [1, 2]: observed [0, 1, 1], expected [1, 0.5, 0.5]
+    test = randomness_test.GapTest([0.1, 0.9, 0.2, 0.8, 0.7, 0.3], max_gap=2)
+    assert test.gaps.tolist() == [1, 2]
+    assert test.x0 == pytest.approx(2.0)
+    assert test.statistic == pytest.approx(stats.chi2.ppf(0.95, 2))
+
+
+def test_gap_without_gaps_fails():
+    test = randomness_test.GapTest([0.9, 0.8, 0.7])
+    assert test.p_value == 0
+    assert not test.passed
+
+
+def test_run_battery():
+    samples = [
+        np.random.default_rng(1).random(5000),
+        MixedCongruentialGenerator(seed=1, a=5, b=7, m=4096),
+    ]
+    results = randomness_test.run_battery(samples, sample_size=4096, max_workers=1)
+    assert results.dtype == randomness_test.BATTERY_DTYPE
+    assert results["sample"].tolist() == [0] * 5 + [1] * 5
+    assert results[results["sample"] == 0]["passed"].all()
+    assert not results[results["sample"] == 1]["passed"].all()
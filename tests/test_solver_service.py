@@ -0,0 +1,71 @@
+import asyncio
+import time
+import numpy as np
+import pytest
+from src.solver_service import AntSystemService
+
+
+def _dj20_distance() -> np.ndarray:
+    cities = np.loadtxt("data/dj38.tsp", skiprows=1)[:20]
+    return np.linalg.norm(cities[:, np.newaxis] - cities[np.newaxis], axis=-1)
+
+
+def _solve(service: AntSystemService, max_cycles: int, **kwargs):
+    return service.solve(_dj20_distance(), 1, 2, 0.1, 5, True, max_cycles, **kwargs)
+
+
+def test_progress_is_delivered():
+    async def main():
+        progress = []
+        async with AntSystemService(max_workers=2) as service:
+            solution, cost = await _solve(
+                service, 10, on_progress=lambda *update: progress.append(update)
+            )
+        return solution, cost, progress
+
+    solution, cost, progress = asyncio.run(main())
+    assert sorted(solution.tolist()) == list(range(20))
+    cycles = [cycle for cycle, _, _ in progress]
+    costs = [progress_cost for _, _, progress_cost in progress]
+    assert cycles == sorted(cycles)
+    assert costs == sorted(costs, reverse=True)
+    assert costs[-1] == cost
+
+
+def test_deadline_returns_best_solution_so_far():
+    async def main():
+        async with AntSystemService(max_workers=2) as service:
+            start = time.perf_counter()
+            result = await _solve(service, 10**6, deadline=1)
+            return result, time.perf_counter() - start
+
+    (solution, _), elapsed = asyncio.run(main())
+    assert sorted(solution.tolist()) == list(range(20))
+    assert elapsed < 5
+
+
+def test_deadline_without_solution_raises():
+    async def main():
+        async with AntSystemService(max_workers=2) as service:
+            await _solve(service, 10**6, deadline=0)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(main())
+
+
+def test_cancellation_stops_request():
+    async def main():
+        async with AntSystemService(max_workers=1) as service:
+            task = asyncio.create_task(_solve(service, 10**6))
+            await asyncio.sleep(0.5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            # The single worker is free again
+            solution, _ = await asyncio.wait_for(_solve(service, 2), timeout=5)
+            return solution, dict(service._requests), dict(service._cancelled)
+
+    solution, requests, cancelled = asyncio.run(main())
+    assert sorted(solution.tolist()) == list(range(20))
+    assert requests == {}
+    assert cancelled == {}